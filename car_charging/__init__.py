@@ -42,7 +42,7 @@ import scipy.ndimage  # type: ignore[import]
 # this package
 from car_charging.consumption import Consumption
 from car_charging.influxdb import tele_period
-from car_charging.tariff import Tariff
+from car_charging.tariff import Tariff, find_active_tariff
 from car_charging.utils import compensate_bst
 
 __all__ = ["calculate_charging_periods"]
@@ -57,6 +57,8 @@ def calculate_charging_periods(
 
 	:param consumption_data:
 	:param tariffs:
+
+	:raises ValueError: If none of the tariffs apply to some of the consumption data.
 	"""
 
 	all_values = []
@@ -71,18 +73,7 @@ def calculate_charging_periods(
 	for the_date in period_start_times:
 		the_date = compensate_bst(the_date)
 		the_time = the_date.time()
-		for tariff in tariffs:
-			if tariff.start_date is None and tariff.end_date is not None and the_date < tariff.end_date:
-				break
-			elif tariff.start_date is not None and tariff.start_date <= the_date and tariff.end_date is None:
-				break
-			elif tariff.start_date is not None and tariff.end_date is not None and tariff.start_date <= the_date < tariff.end_date:
-				break
-		else:
-			print(tariffs)
-			print("No matching tariff for", the_date)
-			print(tariffs[1].start_date)
-			exit(1)
+		tariff = find_active_tariff(tariffs, the_date)
 
 		# if tariff.night_start_time > tariff.night_end_time:
 		# 	if the_time >= tariff.night_start_time:
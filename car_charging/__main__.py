@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+#
+#  __main__.py
+"""
+Command line interface.
+"""
+#
+#  Copyright © 2023 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import argparse
+import datetime
+from typing import List, Optional
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from car_charging import calculate_charging_periods, database
+from car_charging.config import Config
+from car_charging.influxdb import load_consumption_data
+from car_charging.planner import ChargingProfile, plan_charging
+
+__all__ = ["main"]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	"""
+	Entry point for ``python -m car_charging``.
+
+	:param argv: The command line arguments. Defaults to :py:data:`sys.argv`.
+	"""
+
+	parser = argparse.ArgumentParser(prog="python -m car_charging")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	migrate_parser = subparsers.add_parser(
+			"migrate",
+			help="Copy consumption data from a JSON datafile into an SQLite database.",
+			)
+	migrate_parser.add_argument("json_file", help="The JSON datafile to read.")
+	migrate_parser.add_argument("db_file", help="The SQLite database to write to (created if necessary).")
+
+	plan_parser = subparsers.add_parser(
+			"plan",
+			help="Print the cheapest time to start charging, as an ISO 8601 date and time in UTC.",
+			)
+	plan_parser.add_argument("config", help="The configuration file.")
+	plan_parser.add_argument(
+			"--deadline",
+			required=True,
+			type=_parse_datetime,
+			help="The ISO 8601 date and time charging must be finished by. Times without a timezone are local time.",
+			)
+	plan_parser.add_argument(
+			"--energy",
+			type=float,
+			help="The energy required, in kWh. Defaults to the energy used by a typical charging session.",
+			)
+
+	args = parser.parse_args(argv)
+
+	if args.command == "migrate":
+		database.migrate_json(PathPlus(args.json_file), PathPlus(args.db_file))
+
+	elif args.command == "plan":
+		config = Config.load(PathPlus(args.config))
+		consumption_data = load_consumption_data(config)
+
+		if not consumption_data:
+			parser.exit(1, "Error: No consumption data to learn the charging profile from.\n")
+
+		try:
+			profile = ChargingProfile.from_charging_periods(
+					calculate_charging_periods(consumption_data, config.tariffs),
+					)
+			if args.energy is None:
+				args.energy = profile.typical_energy
+
+			plan = plan_charging(
+					args.energy,
+					profile.charge_rate,
+					args.deadline,
+					tariffs=config.tariffs,
+					)
+		except ValueError as e:
+			parser.exit(1, f"Error: {e}\n")
+
+		print(plan.start.isoformat())
+
+
+def _parse_datetime(value: str) -> datetime.datetime:
+	# Times without a timezone are taken to be in the local timezone.
+	try:
+		return datetime.datetime.fromisoformat(value).astimezone()
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"invalid ISO 8601 date and time: {value!r}")
+
+
+if __name__ == "__main__":
+	main()
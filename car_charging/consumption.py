@@ -28,6 +28,10 @@ Models electricity consumption.
 
 # stdlib
 import datetime
+import json
+import os
+import stat
+import tempfile
 from typing import List, TypedDict
 
 # 3rd party
@@ -63,7 +67,35 @@ def to_json(consumption_data: List[Consumption], filename: PathPlus) -> None:
 				"start_time": period_data["start_time"].isoformat(),
 				})
 
-	filename.dump_json(output_data)
+	if filename.is_file():
+		mode = stat.S_IMODE(filename.stat().st_mode)
+	else:
+		mode = 0o666 & ~_get_umask()
+
+	# Write to a temporary file and then replace, so readers never see a partially written file.
+	fp = tempfile.NamedTemporaryFile(
+			'w',
+			encoding="UTF-8",
+			dir=filename.parent,
+			prefix=filename.name,
+			suffix=".tmp",
+			delete=False,
+			)
+	tmp_filename = PathPlus(fp.name)
+
+	try:
+		with fp:
+			fp.write(json.dumps(output_data))
+			fp.write('\n')
+			fp.flush()
+			os.fsync(fp.fileno())
+
+		# The temporary file is only readable by the current user, so match the datafile's permissions.
+		os.chmod(tmp_filename, mode)
+		os.replace(tmp_filename, filename)
+	except BaseException:
+		tmp_filename.unlink(missing_ok=True)
+		raise
 
 
 def from_json(filename: PathPlus) -> List[Consumption]:
@@ -79,3 +111,9 @@ def from_json(filename: PathPlus) -> List[Consumption]:
 		period["start_time"] = datetime.datetime.fromisoformat(period["start_time"])
 
 	return consumption_data
+
+
+def _get_umask() -> int:
+	umask = os.umask(0)
+	os.umask(umask)
+	return umask
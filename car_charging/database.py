@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+#
+#  database.py
+"""
+Store consumption data in an SQLite database.
+
+The database is opened in write-ahead logging mode, so reporting scripts
+can read from it while the sync job appends new data.
+Times are stored as ISO 8601 strings in UTC, and must be timezone-aware.
+
+Existing JSON datafiles can be converted with ``python -m car_charging migrate <json file> <database>``.
+"""
+#
+#  Copyright © 2023 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import datetime
+import sqlite3
+from contextlib import closing
+from typing import List, Optional
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from car_charging import consumption
+
+__all__ = [
+		"connect",
+		"insert_consumption",
+		"is_database",
+		"latest_start_time",
+		"load_consumption",
+		"migrate_json",
+		"total_consumption",
+		]
+
+_schema = """
+CREATE TABLE IF NOT EXISTS consumption (
+	start_time TEXT NOT NULL,
+	value REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS consumption_start_time ON consumption (start_time);
+"""
+
+
+def is_database(filename: PathPlus) -> bool:
+	"""
+	Returns whether the given datafile should be treated as an SQLite database (rather than JSON).
+
+	:param filename:
+	"""
+
+	return filename.suffix.lower() in {".db", ".sqlite", ".sqlite3"}
+
+
+def connect(filename: PathPlus, read_only: bool = False) -> sqlite3.Connection:
+	"""
+	Open (and if necessary create) the consumption database.
+
+	:param filename:
+	:param read_only: Open the existing database without writing to it.
+	"""
+
+	if read_only:
+		return sqlite3.connect(f"{filename.absolute().as_uri()}?mode=ro", uri=True, timeout=30)
+
+	conn = sqlite3.connect(filename, timeout=30)
+	conn.execute("PRAGMA journal_mode=WAL")
+	conn.executescript(_schema)
+	return conn
+
+
+def insert_consumption(conn: sqlite3.Connection, consumption_data: List[consumption.Consumption]) -> None:
+	"""
+	Add consumption data to the database.
+
+	Data for start times already in the database is ignored.
+
+	:raises ValueError: If any of the start times are naive (have no timezone).
+
+	:param conn:
+	:param consumption_data:
+	"""
+
+	with conn:
+		conn.executemany(
+				"INSERT OR IGNORE INTO consumption (start_time, value) VALUES (?, ?)",
+				[(_to_utc_string(period["start_time"]), period["value"]) for period in consumption_data],
+				)
+
+
+def load_consumption(
+		conn: sqlite3.Connection,
+		start: Optional[datetime.datetime] = None,
+		end: Optional[datetime.datetime] = None,
+		) -> List[consumption.Consumption]:
+	"""
+	Load consumption data from the database, in chronological order.
+
+	:param conn:
+	:param start: If given, only return data starting at or after this time.
+	:param end: If given, only return data starting before this time.
+
+	:raises ValueError: If ``start`` or ``end`` are naive (have no timezone).
+	"""
+
+	query = "SELECT value, start_time FROM consumption" + _where_clause(start, end) + " ORDER BY start_time"
+
+	consumption_data: List[consumption.Consumption] = []
+	for value, start_time in conn.execute(query, _bounds(start, end)):
+		consumption_data.append({
+				"value": value,
+				"start_time": datetime.datetime.fromisoformat(start_time),
+				})
+
+	return consumption_data
+
+
+def latest_start_time(conn: sqlite3.Connection) -> Optional[datetime.datetime]:
+	"""
+	Returns the start time of the most recent consumption data in the database,
+	or :py:obj:`None` if the database is empty.
+
+	:param conn:
+	"""
+
+	(start_time, ) = conn.execute("SELECT MAX(start_time) FROM consumption").fetchone()
+
+	if start_time is None:
+		return None
+
+	return datetime.datetime.fromisoformat(start_time)
+
+
+def total_consumption(
+		conn: sqlite3.Connection,
+		start: Optional[datetime.datetime] = None,
+		end: Optional[datetime.datetime] = None,
+		) -> float:
+	"""
+	Returns the total consumption, in Watt hours, between the given times.
+
+	:param conn:
+	:param start: If given, only include data starting at or after this time.
+	:param end: If given, only include data starting before this time.
+
+	:raises ValueError: If ``start`` or ``end`` are naive (have no timezone).
+	"""
+
+	query = "SELECT TOTAL(value) FROM consumption" + _where_clause(start, end)
+	(total, ) = conn.execute(query, _bounds(start, end)).fetchone()
+	return total
+
+
+def migrate_json(json_file: PathPlus, db_file: PathPlus) -> None:
+	"""
+	Copy consumption data from a JSON datafile into an SQLite database.
+
+	:param json_file:
+	:param db_file:
+	"""
+
+	with closing(connect(db_file)) as conn:
+		insert_consumption(conn, consumption.from_json(json_file))
+
+
+def _where_clause(start: Optional[datetime.datetime], end: Optional[datetime.datetime]) -> str:
+	conditions = []
+
+	if start is not None:
+		conditions.append("start_time >= ?")
+	if end is not None:
+		conditions.append("start_time < ?")
+
+	if conditions:
+		return " WHERE " + " AND ".join(conditions)
+
+	return ''
+
+
+def _bounds(start: Optional[datetime.datetime], end: Optional[datetime.datetime]) -> List[str]:
+	return [_to_utc_string(date) for date in (start, end) if date is not None]
+
+
+def _to_utc_string(date: datetime.datetime) -> str:
+	# Times are compared as strings, so must all be in the same timezone.
+	if date.tzinfo is None or date.utcoffset() is None:
+		raise ValueError(f"Naive datetime {date!r} must have a timezone.")
+
+	return date.astimezone(datetime.timezone.utc).isoformat()
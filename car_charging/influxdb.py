@@ -28,39 +28,89 @@ Interface to InfluxDB.
 
 # stdlib
 import datetime
-from typing import List
+from contextlib import closing
+from typing import List, Optional
 
 # 3rd party
 from influxdb_client import InfluxDBClient
 
 # this package
-from car_charging import consumption
+from car_charging import consumption, database
 from car_charging.config import Config
 
-__all__ = ["update_consumption_data"]
+__all__ = ["load_consumption_data", "update_consumption_data"]
 
 tele_period = datetime.timedelta(seconds=20)
 
 
+def load_consumption_data(
+		config: Config,
+		start: Optional[datetime.datetime] = None,
+		end: Optional[datetime.datetime] = None,
+		) -> List[consumption.Consumption]:
+	"""
+	Load the cached consumption data, without updating it from InfluxDB.
+
+	The datafile is never written to, so this is safe to call while :func:`~.update_consumption_data` is running.
+
+	:param config:
+	:param start: If given, only return data starting at or after this time.
+	:param end: If given, only return data starting before this time.
+
+	:raises ValueError: If ``start`` or ``end`` are naive (have no timezone).
+	"""
+
+	datafile = config.datafile
+
+	for date in (start, end):
+		if date is not None and date.utcoffset() is None:
+			raise ValueError(f"Naive datetime {date!r} must have a timezone.")
+
+	if not datafile.is_file():
+		return []
+
+	if database.is_database(datafile):
+		with closing(database.connect(datafile, read_only=True)) as conn:
+			return database.load_consumption(conn, start, end)
+
+	consumption_data = consumption.from_json(datafile)
+
+	if start is not None:
+		consumption_data = [period for period in consumption_data if period["start_time"] >= start]
+	if end is not None:
+		consumption_data = [period for period in consumption_data if period["start_time"] < end]
+
+	return consumption_data
+
+
 def update_consumption_data(config: Config) -> List[consumption.Consumption]:
 	"""
 	Update the cached consumption data from InfluxDB.
 
+	If :attr:`config.datafile <.Config.datafile>` has a ``.db``, ``.sqlite`` or ``.sqlite3`` suffix
+	the data is stored in an SQLite database (see :mod:`car_charging.database`), otherwise as JSON.
+
 	:param config:
 	"""
 
 	influxdb_config = config.influxdb
-	json_datafile = config.datafile
+	datafile = config.datafile
+	default_start = datetime.datetime(year=2022, month=9, day=18, tzinfo=datetime.timezone.utc)
+	# default_start = datetime.datetime(year=2023, month=8, day=14)
 
 	consumption_data: List[consumption.Consumption]
 
-	if json_datafile.is_file():
-		consumption_data = consumption.from_json(json_datafile)
+	if database.is_database(datafile):
+		with closing(database.connect(datafile)) as conn:
+			latest_period = database.latest_start_time(conn) or default_start
+	elif datafile.is_file():
+		consumption_data = consumption.from_json(datafile)
 		latest_period = consumption_data[-1]["start_time"]
 	else:
 		consumption_data = []
-		latest_period = datetime.datetime(year=2022, month=9, day=18, tzinfo=datetime.timezone.utc)
-		# latest_period = datetime.datetime(year=2023, month=8, day=14)
+		latest_period = default_start
+
+	new_consumption_data: List[consumption.Consumption] = []
 
 	with InfluxDBClient(
 			url=influxdb_config["host"], token=influxdb_config["token"], org=influxdb_config["org"]
@@ -81,11 +131,17 @@ def update_consumption_data(config: Config) -> List[consumption.Consumption]:
 
 		for x in tables[0]:
 			# print(x)
-			consumption_data.append({
+			new_consumption_data.append({
 					"value": x.values.get("_value"),
 					"start_time": x.values.get("_time"),
 					})
 
-		consumption.to_json(consumption_data, json_datafile)
+	if database.is_database(datafile):
+		with closing(database.connect(datafile)) as conn:
+			database.insert_consumption(conn, new_consumption_data)
+			consumption_data = database.load_consumption(conn)
+	else:
+		consumption_data.extend(new_consumption_data)
+		consumption.to_json(consumption_data, datafile)
 
 	return consumption_data
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+#
+#  planner.py
+"""
+Find the cheapest time to charge the car.
+"""
+#
+#  Copyright © 2023 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import datetime
+import math
+import statistics
+from typing import List, Optional, Tuple
+
+# 3rd party
+import attr
+
+# this package
+from car_charging.tariff import Tariff, find_active_tariff
+from car_charging.utils import compensate_bst
+
+__all__ = ["ChargingPlan", "ChargingProfile", "plan_charging", "rate_timeline"]
+
+#: The length of each slot in the rate timeline.
+slot_length = datetime.timedelta(minutes=30)
+
+
+@attr.define
+class ChargingProfile:
+	"""
+	Typical charging behaviour, learned from past charging periods.
+	"""
+
+	#: The rate the charger draws power at, in kW.
+	charge_rate: float
+
+	#: The energy used by a typical charging session, in kWh.
+	typical_energy: float
+
+	@classmethod
+	def from_charging_periods(
+			cls,
+			charging_periods: List[Tuple[float, datetime.datetime, datetime.datetime, float]],
+			) -> "ChargingProfile":
+		"""
+		Construct a :class:`~.ChargingProfile` from the output of :func:`~.calculate_charging_periods`.
+
+		The median is used so a few short top-ups don't skew the profile.
+
+		:param charging_periods:
+		"""
+
+		rates = []
+		totals = []
+
+		for (total, start, end, price) in charging_periods:
+			if total > 0.01:
+				hours = (end - start).total_seconds() / 3600
+				rates.append(total / hours)
+				totals.append(total)
+
+		if not totals:
+			raise ValueError("No charging periods to learn from.")
+
+		return cls(
+				charge_rate=statistics.median(rates),
+				typical_energy=statistics.median(totals),
+				)
+
+
+@attr.define
+class ChargingPlan:
+	"""
+	The cheapest time to charge the car.
+	"""
+
+	#: The time to start charging.
+	start: datetime.datetime
+
+	#: The time charging is expected to finish.
+	end: datetime.datetime
+
+	#: The expected cost of charging, in pence.
+	cost: float
+
+
+def rate_timeline(
+		tariffs: List[Tariff],
+		start: datetime.datetime,
+		end: datetime.datetime,
+		) -> List[Tuple[datetime.datetime, float]]:
+	"""
+	Returns the rate in ``p/kWh`` for each half-hour slot between ``start`` and ``end``.
+
+	:param tariffs:
+	:param start: The start of the first slot.
+	:param end: No slots start on or after this time.
+
+	:returns: A list of ``(slot start time, rate)`` tuples.
+	"""
+
+	timeline = []
+	slot_start = start
+
+	while slot_start < end:
+		the_date = compensate_bst(slot_start)
+		tariff = find_active_tariff(tariffs, the_date)
+		timeline.append((slot_start, tariff.get_rate(the_date.time())))
+		slot_start += slot_length
+
+	return timeline
+
+
+def plan_charging(
+		energy: float,
+		charge_rate: float,
+		deadline: datetime.datetime,
+		tariffs: Optional[List[Tariff]] = None,
+		timeline: Optional[List[Tuple[datetime.datetime, float]]] = None,
+		now: Optional[datetime.datetime] = None,
+		) -> ChargingPlan:
+	"""
+	Find the cheapest time to start charging so that charging finishes by the deadline.
+
+	Charging is assumed to start at the beginning of a half-hour slot and continue
+	at a constant rate until the required energy has been delivered.
+
+	:param energy: The energy required, in kWh.
+	:param charge_rate: The rate the charger draws power at, in kW (see :class:`~.ChargingProfile`).
+	:param deadline: The time charging must be finished by.
+	:param tariffs: The tariffs to calculate the cost from.
+	:param timeline: A contiguous series of half-hourly ``(slot start time, rate)`` tuples,
+		such as from a tariff with half-hourly pricing. Used instead of ``tariffs`` if given.
+	:param now: The earliest time charging can start. Defaults to the current time.
+
+	:raises ValueError: If ``energy`` or ``charge_rate`` are not positive, if ``deadline`` or ``now`` are naive,
+		if ``timeline`` has gaps in it, or if charging cannot be completed before the deadline.
+	"""
+
+	if energy <= 0:
+		raise ValueError("'energy' must be greater than zero.")
+	if charge_rate <= 0:
+		raise ValueError("'charge_rate' must be greater than zero.")
+	if deadline.utcoffset() is None:
+		raise ValueError("'deadline' must have a timezone.")
+	if now is not None and now.utcoffset() is None:
+		raise ValueError("'now' must have a timezone.")
+
+	if now is None:
+		now = datetime.datetime.now(tz=datetime.timezone.utc)
+
+	if timeline is None:
+		if tariffs is None:
+			raise TypeError("Either 'tariffs' or 'timeline' must be given.")
+		timeline = rate_timeline(tariffs, _next_slot(now), deadline)
+	else:
+		timeline = [(slot_start, rate) for slot_start, rate in timeline if now <= slot_start < deadline]
+
+		for (slot_start, rate), (next_slot_start, next_rate) in zip(timeline, timeline[1:]):
+			if next_slot_start - slot_start != slot_length:
+				raise ValueError(f"'timeline' is not contiguous between {slot_start} and {next_slot_start}.")
+
+	duration = datetime.timedelta(hours=energy / charge_rate)
+	slot_energy = charge_rate * (slot_length.total_seconds() / 3600)
+
+	# Allow for rounding errors when the energy fills an exact number of slots.
+	n_slots = max(math.ceil(duration / slot_length - 1e-9), 1)
+	remainder = energy - (n_slots - 1) * slot_energy  # The energy used in the last slot.
+
+	# Only consider start times which finish by the deadline.
+	n_starts = sum(slot_start + duration <= deadline for slot_start, rate in timeline)
+	n_starts = min(n_starts, len(timeline) - n_slots + 1)
+
+	if n_starts < 1:
+		raise ValueError("Not enough time to charge before the deadline.")
+
+	rates = [rate for slot_start, rate in timeline]
+
+	# Sliding window over the rates; the last slot in the window may only be partially used.
+	window_total = sum(rates[:n_slots - 1])
+	best_cost = math.inf
+	best_index = 0
+
+	for index in range(n_starts):
+		last_rate = rates[index + n_slots - 1]
+		cost = window_total * slot_energy + last_rate * remainder
+
+		if cost < best_cost:
+			best_cost = cost
+			best_index = index
+
+		window_total += last_rate - rates[index]
+
+	start = timeline[best_index][0]
+
+	return ChargingPlan(start=start, end=start + duration, cost=best_cost)
+
+
+def _next_slot(time: datetime.datetime) -> datetime.datetime:
+	# Round up to the start of the next half-hour slot.
+	slot_start = time.replace(minute=time.minute // 30 * 30, second=0, microsecond=0)
+
+	if slot_start < time:
+		slot_start += slot_length
+
+	return slot_start
@@ -28,7 +28,7 @@ Models an electricity tariff with different rates for day and night time.
 
 # stdlib
 import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 # 3rd party
 import attr
@@ -36,7 +36,7 @@ import attr
 # this package
 from car_charging.utils import compensate_bst
 
-__all__ = ["Tariff"]
+__all__ = ["Tariff", "find_active_tariff"]
 
 
 @attr.define
@@ -63,6 +63,25 @@ class Tariff:
 	#: The date (and time) this tariff ended.
 	end_date: Optional[datetime.date] = attr.field(default=None)
 
+	def is_active(self, date: datetime.datetime) -> bool:
+		"""
+		Returns whether this tariff applies at the given date and time.
+
+		A tariff without a start date applies up until its end date,
+		and a tariff without an end date applies from its start date onwards.
+
+		:param date:
+		"""
+
+		if self.start_date is None and self.end_date is not None:
+			return date < self.end_date
+		elif self.start_date is not None and self.end_date is None:
+			return self.start_date <= date
+		elif self.start_date is not None and self.end_date is not None:
+			return self.start_date <= date < self.end_date
+
+		return False
+
 	def get_rate(self, time: datetime.time) -> float:
 		"""
 		Return the rate (day/night) in ``p/kWh`` for the given time.
@@ -109,3 +128,20 @@ class Tariff:
 				start_date=start_date,
 				end_date=end_date,
 				)
+
+
+def find_active_tariff(tariffs: List[Tariff], date: datetime.datetime) -> Tariff:
+	"""
+	Returns the first tariff which applies at the given date and time.
+
+	:param tariffs:
+	:param date:
+
+	:raises ValueError: If none of the tariffs apply at that date and time.
+	"""
+
+	for tariff in tariffs:
+		if tariff.is_active(date):
+			return tariff
+
+	raise ValueError(f"No matching tariff for {date}")
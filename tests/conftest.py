@@ -0,0 +1,6 @@
+# 3rd party
+from hypothesis import settings
+
+# The first call into scipy can be slow, so don't enforce a per-example deadline.
+settings.register_profile("car_charging", deadline=None)
+settings.load_profile("car_charging")
@@ -0,0 +1,98 @@
+"""
+Reference implementations of the charging period calculations, frozen from the original behaviour.
+
+These must not be changed when optimising the implementations in :mod:`car_charging`;
+the tests check the library against them.
+"""
+
+# stdlib
+import datetime
+import json
+from typing import List, Tuple
+
+# 3rd party
+import scipy.ndimage  # type: ignore[import]
+
+# this package
+from car_charging.consumption import Consumption
+from car_charging.influxdb import tele_period
+from car_charging.tariff import Tariff
+from car_charging.utils import compensate_bst
+
+
+def get_rate(tariff: Tariff, time: datetime.time) -> float:
+	if tariff.night_start_time > tariff.night_end_time:
+		if time >= tariff.night_start_time:
+			return tariff.night_rate
+		elif time < tariff.night_end_time:
+			return tariff.night_rate
+		else:
+			return tariff.day_rate
+
+	if tariff.night_start_time <= time < tariff.night_end_time:
+		return tariff.night_rate
+	else:
+		return tariff.day_rate
+
+
+def find_tariff(tariffs: List[Tariff], the_date: datetime.datetime) -> Tariff:
+	for tariff in tariffs:
+		if tariff.start_date is None and tariff.end_date is not None and the_date < tariff.end_date:
+			return tariff
+		elif tariff.start_date is not None and tariff.start_date <= the_date and tariff.end_date is None:
+			return tariff
+		elif tariff.start_date is not None and tariff.end_date is not None and tariff.start_date <= the_date < tariff.end_date:
+			return tariff
+
+	raise LookupError(f"No matching tariff for {the_date}")
+
+
+def from_json(text: str) -> List[Consumption]:
+	consumption_data = json.loads(text)
+
+	for period in consumption_data:
+		period["start_time"] = datetime.datetime.fromisoformat(period["start_time"])
+
+	return consumption_data
+
+
+def calculate_charging_periods(
+		consumption_data: List[Consumption],
+		tariffs: List[Tariff],
+		) -> List[Tuple[float, datetime.datetime, datetime.datetime, float]]:
+	all_values = []
+	period_start_times = []
+
+	for period in consumption_data:
+		all_values.append(period["value"])
+		period_start_times.append(period["start_time"])
+
+	period_rates = []
+	for the_date in period_start_times:
+		the_date = compensate_bst(the_date)
+		tariff = find_tariff(tariffs, the_date)
+		period_rates.append(get_rate(tariff, the_date.time()))
+
+	groups = scipy.ndimage.find_objects(scipy.ndimage.label(all_values)[0])
+	charging_sums = [sum(all_values[x[0]]) / 1000 for x in groups]
+	charging_start_ends = [(period_start_times[x[0]][0], period_start_times[x[0]][-1] + tele_period) for x in groups]
+	charging_costs = []
+
+	for x in groups:
+		rates_in_group = period_rates[x[0]]
+		consumptions_in_group = all_values[x[0]]
+		charging_costs.append(sum([r * (c / 1000) for r, c in zip(rates_in_group, consumptions_in_group)]))
+
+	charging_periods: List[Tuple[float, datetime.datetime, datetime.datetime, float]] = []
+
+	for total, (start, end), price in zip(charging_sums, charging_start_ends, charging_costs):
+		if charging_periods:
+			last_period = charging_periods[-1]
+
+			if start - tele_period == last_period[2]:
+				charging_periods[-1] = (last_period[0] + total, last_period[1], end, last_period[3] + price)
+				continue
+
+		charging_periods.append((total, start, end, price))
+
+	return charging_periods
@@ -0,0 +1,84 @@
+"""
+Hypothesis strategies for consumption data and tariffs.
+"""
+
+# stdlib
+import datetime
+from typing import List
+
+# 3rd party
+from hypothesis import strategies as st
+
+# this package
+from car_charging.consumption import Consumption
+from car_charging.influxdb import tele_period
+from car_charging.tariff import Tariff
+
+utc = datetime.timezone.utc
+
+#: Start date for the first tariff when there's only one.
+epoch = datetime.datetime(2000, 1, 1, tzinfo=utc)
+
+
+def aware_datetimes() -> st.SearchStrategy[datetime.datetime]:
+	return st.datetimes(
+			min_value=datetime.datetime(2022, 1, 1),
+			max_value=datetime.datetime(2025, 12, 31),
+			timezones=st.just(utc),
+			)
+
+
+def times() -> st.SearchStrategy[datetime.time]:
+	return st.builds(datetime.time, st.integers(0, 23), st.sampled_from([0, 15, 30, 45]))
+
+
+def rates() -> st.SearchStrategy[float]:
+	return st.floats(min_value=0, max_value=100, allow_nan=False)
+
+
+@st.composite
+def tariff_lists(draw: st.DrawFn) -> List[Tariff]:
+	"""
+	A list of tariffs covering all dates, with switchovers between them.
+	"""
+
+	boundaries = sorted(set(draw(st.lists(aware_datetimes(), max_size=3))))
+
+	tariffs = []
+	for i in range(len(boundaries) + 1):
+		if boundaries:
+			start_date = boundaries[i - 1] if i > 0 else None
+		else:
+			start_date = epoch
+		end_date = boundaries[i] if i < len(boundaries) else None
+
+		tariffs.append(
+				Tariff(
+						draw(times()),
+						draw(times()),
+						draw(rates()),
+						draw(rates()),
+						start_date=start_date,
+						end_date=end_date,
+						)
+				)
+
+	return draw(st.permutations(tariffs))
+
+
+@st.composite
+def consumption_series(draw: st.DrawFn, max_size: int = 200) -> List[Consumption]:
+	"""
+	A series of consumption data, with charging runs separated by zeros and gaps in the data.
+	"""
+
+	start_time = draw(aware_datetimes())
+	values = st.just(0.0) | st.floats(min_value=0.01, max_value=1000)
+	gaps = st.sampled_from([1, 1, 1, 1, 2, 3, 180])
+
+	consumption_data: List[Consumption] = []
+	for value, gap in draw(st.lists(st.tuples(values, gaps), min_size=1, max_size=max_size)):
+		consumption_data.append({"value": value, "start_time": start_time})
+		start_time += tele_period * gap
+
+	return consumption_data
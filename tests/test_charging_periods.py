@@ -0,0 +1,160 @@
+# stdlib
+import datetime
+from typing import List
+
+# 3rd party
+import pytest
+from hypothesis import given
+
+# this package
+from car_charging import calculate_charging_periods
+from car_charging.consumption import Consumption
+from car_charging.influxdb import tele_period
+from car_charging.tariff import Tariff
+from tests import reference
+from tests.strategies import consumption_series, tariff_lists
+
+utc = datetime.timezone.utc
+
+octopus_go = Tariff(
+		datetime.time(0, 30),
+		datetime.time(4, 30),
+		day_rate=30.0,
+		night_rate=10.0,
+		start_date=datetime.datetime(2000, 1, 1, tzinfo=utc),
+		)
+
+
+def make_series(start_time: datetime.datetime, values: List[float]) -> List[Consumption]:
+	return [{"value": value, "start_time": start_time + tele_period * idx} for idx, value in enumerate(values)]
+
+
+def assert_matches_reference(consumption_data: List[Consumption], tariffs: List[Tariff]) -> None:
+	expected = reference.calculate_charging_periods(consumption_data, tariffs)
+	actual = calculate_charging_periods(consumption_data, tariffs)
+
+	assert len(actual) == len(expected)
+
+	for (total, start, end, price), (ref_total, ref_start, ref_end, ref_price) in zip(actual, expected):
+		assert start == ref_start
+		assert end == ref_end
+		assert total == pytest.approx(ref_total, rel=1e-9, abs=1e-12)
+		assert price == pytest.approx(ref_price, rel=1e-9, abs=1e-12)
+
+
+@given(consumption_data=consumption_series(), tariffs=tariff_lists())
+def test_matches_reference(consumption_data, tariffs):
+	assert_matches_reference(consumption_data, tariffs)
+
+
+def test_merges_runs_one_teleperiod_apart():
+	start_time = datetime.datetime(2023, 1, 10, 12, 0, tzinfo=utc)
+	consumption_data = make_series(start_time, [500, 500, 0, 500, 500])
+
+	assert calculate_charging_periods(consumption_data, [octopus_go]) == [
+			(2.0, start_time, start_time + tele_period * 5, 60.0),
+			]
+	assert_matches_reference(consumption_data, [octopus_go])
+
+
+def test_does_not_merge_runs_two_teleperiods_apart():
+	start_time = datetime.datetime(2023, 1, 10, 12, 0, tzinfo=utc)
+	consumption_data = make_series(start_time, [500, 0, 0, 500])
+
+	assert calculate_charging_periods(consumption_data, [octopus_go]) == [
+			(0.5, start_time, start_time + tele_period, 15.0),
+			(0.5, start_time + tele_period * 3, start_time + tele_period * 4, 15.0),
+			]
+	assert_matches_reference(consumption_data, [octopus_go])
+
+
+def test_night_window_wraps_midnight():
+	tariff = Tariff(
+			datetime.time(23, 30),
+			datetime.time(5, 30),
+			day_rate=30.0,
+			night_rate=10.0,
+			start_date=datetime.datetime(2000, 1, 1, tzinfo=utc),
+			)
+	start_time = datetime.datetime(2023, 1, 10, 23, 29, 40, tzinfo=utc)
+	consumption_data = make_series(start_time, [1000, 1000, 1000])
+
+	assert calculate_charging_periods(consumption_data, [tariff]) == [
+			(3.0, start_time, start_time + tele_period * 3, 50.0),
+			]
+	assert_matches_reference(consumption_data, [tariff])
+
+
+def test_sample_on_tariff_end_date():
+	switchover = datetime.datetime(2023, 1, 15, 12, 0, tzinfo=utc)
+	tariffs = [
+			Tariff(datetime.time(0, 30), datetime.time(4, 30), 30.0, 10.0, end_date=switchover),
+			Tariff(datetime.time(0, 30), datetime.time(4, 30), 35.0, 8.0, start_date=switchover),
+			]
+	consumption_data = make_series(switchover - tele_period, [1000, 1000])
+
+	assert calculate_charging_periods(consumption_data, tariffs) == [
+			(2.0, switchover - tele_period, switchover + tele_period, 65.0),
+			]
+	assert_matches_reference(consumption_data, tariffs)
+
+
+@pytest.mark.parametrize(
+		"day",
+		[
+				pytest.param(datetime.datetime(2023, 3, 26, tzinfo=utc), id="2023_start"),
+				pytest.param(datetime.datetime(2023, 10, 29, tzinfo=utc), id="2023_end"),
+				pytest.param(datetime.datetime(2024, 3, 31, tzinfo=utc), id="2024_start"),
+				pytest.param(datetime.datetime(2024, 10, 27, tzinfo=utc), id="2024_end"),
+				]
+		)
+def test_bst_transition_days(day):
+	start_time = day - datetime.timedelta(hours=2)
+	consumption_data = make_series(start_time, [100.0] * (8 * 180))
+	assert_matches_reference(consumption_data, [octopus_go])
+
+
+bst_tariff = Tariff(
+		datetime.time(1, 0),
+		datetime.time(2, 0),
+		day_rate=30.0,
+		night_rate=10.0,
+		start_date=datetime.datetime(2000, 1, 1, tzinfo=utc),
+		)
+
+
+@pytest.mark.parametrize(
+		"start_time, price",
+		[
+				# compensate_bst works a day at a time, so all of the day the clocks go forward is BST...
+				(datetime.datetime(2023, 3, 25, 0, 59, 40, tzinfo=utc), 30.0),
+				(datetime.datetime(2023, 3, 25, 1, 0, 0, tzinfo=utc), 10.0),
+				(datetime.datetime(2023, 3, 26, 0, 59, 40, tzinfo=utc), 10.0),
+				(datetime.datetime(2023, 3, 26, 1, 0, 0, tzinfo=utc), 30.0),
+				(datetime.datetime(2024, 3, 31, 0, 59, 40, tzinfo=utc), 10.0),
+				(datetime.datetime(2024, 3, 31, 1, 0, 0, tzinfo=utc), 30.0),
+				# ...and all of the day the clocks go back is GMT.
+				(datetime.datetime(2023, 10, 28, 0, 59, 40, tzinfo=utc), 10.0),
+				(datetime.datetime(2023, 10, 28, 1, 0, 0, tzinfo=utc), 30.0),
+				(datetime.datetime(2023, 10, 29, 0, 59, 40, tzinfo=utc), 30.0),
+				(datetime.datetime(2023, 10, 29, 1, 0, 0, tzinfo=utc), 10.0),
+				(datetime.datetime(2024, 10, 27, 0, 59, 40, tzinfo=utc), 30.0),
+				(datetime.datetime(2024, 10, 27, 1, 0, 0, tzinfo=utc), 10.0),
+				]
+		)
+def test_bst_transition_rates(start_time, price):
+	consumption_data = make_series(start_time, [1000])
+
+	assert calculate_charging_periods(consumption_data, [bst_tariff]) == [
+			(1.0, start_time, start_time + tele_period, price),
+			]
+
+
+def test_bst_offset():
+	# 00:00 UTC is 01:00 BST, which is within the night window.
+	start_time = datetime.datetime(2023, 7, 1, 0, 0, tzinfo=utc)
+	consumption_data = make_series(start_time, [1000])
+
+	assert calculate_charging_periods(consumption_data, [octopus_go]) == [
+			(1.0, start_time, start_time + tele_period, 10.0),
+			]
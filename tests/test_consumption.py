@@ -0,0 +1,47 @@
+# stdlib
+import os
+import stat
+import sys
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus, TemporaryPathPlus
+from hypothesis import given
+
+# this package
+from car_charging import consumption
+from tests import reference
+from tests.strategies import consumption_series
+
+
+@given(consumption_data=consumption_series())
+def test_json_round_trip(consumption_data):
+	with TemporaryPathPlus() as tmpdir:
+		datafile = tmpdir / "data.json"
+		consumption.to_json(consumption_data, datafile)
+
+		assert consumption.from_json(datafile) == consumption_data
+		assert consumption.from_json(datafile) == reference.from_json(datafile.read_text())
+		assert [path.name for path in tmpdir.iterdir()] == ["data.json"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows doesn't have Unix file permissions")
+def test_to_json_keeps_permissions(tmp_path):
+	datafile = PathPlus(tmp_path) / "data.json"
+
+	consumption.to_json([], datafile)
+	assert stat.S_IMODE(datafile.stat().st_mode) == 0o666 & ~get_umask()
+
+	datafile.chmod(0o644)
+	consumption.to_json([], datafile)
+	assert stat.S_IMODE(datafile.stat().st_mode) == 0o644
+
+	datafile.chmod(0o640)
+	consumption.to_json([], datafile)
+	assert stat.S_IMODE(datafile.stat().st_mode) == 0o640
+
+
+def get_umask() -> int:
+	umask = os.umask(0)
+	os.umask(umask)
+	return umask
@@ -0,0 +1,200 @@
+# stdlib
+import datetime
+import sqlite3
+from contextlib import closing
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus, TemporaryPathPlus
+from hypothesis import given
+
+# this package
+from car_charging import consumption, database
+from car_charging.__main__ import main
+from car_charging.config import Config
+from car_charging.influxdb import load_consumption_data, tele_period
+from tests.strategies import consumption_series
+
+utc = datetime.timezone.utc
+start_time = datetime.datetime(2023, 1, 10, 12, 0, tzinfo=utc)
+consumption_data = [{"value": float(idx), "start_time": start_time + tele_period * idx} for idx in range(10)]
+
+
+@pytest.fixture()
+def tmp_pathplus(tmp_path) -> PathPlus:
+	return PathPlus(tmp_path)
+
+
+@pytest.fixture()
+def conn(tmp_pathplus: PathPlus):
+	with closing(database.connect(tmp_pathplus / "data.db")) as conn:
+		yield conn
+
+
+def make_config(datafile: PathPlus) -> Config:
+	return Config(datafile, {"host": '', "token": '', "org": '', "topic": '', "field": ''}, [])
+
+
+@pytest.mark.parametrize(
+		"filename, expected",
+		[
+				("data.db", True),
+				("data.sqlite", True),
+				("data.SQLITE3", True),
+				("data.json", False),
+				("car_charging.json", False),
+				]
+		)
+def test_is_database(filename, expected):
+	assert database.is_database(PathPlus(filename)) is expected
+
+
+def test_wal_mode(conn):
+	assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal", )
+
+
+def test_empty(conn):
+	assert database.load_consumption(conn) == []
+	assert database.latest_start_time(conn) is None
+	assert database.total_consumption(conn) == 0
+
+
+def test_insert_ignores_duplicates(conn):
+	database.insert_consumption(conn, consumption_data[:6])
+	database.insert_consumption(conn, consumption_data[4:])
+
+	assert database.load_consumption(conn) == consumption_data
+	assert database.latest_start_time(conn) == consumption_data[-1]["start_time"]
+
+
+def test_range_queries(conn):
+	database.insert_consumption(conn, consumption_data)
+	start = consumption_data[2]["start_time"]
+	end = consumption_data[5]["start_time"]
+
+	assert database.load_consumption(conn, start, end) == consumption_data[2:5]
+	assert database.load_consumption(conn, start=start) == consumption_data[2:]
+	assert database.load_consumption(conn, end=end) == consumption_data[:5]
+
+	assert database.total_consumption(conn) == 45
+	assert database.total_consumption(conn, start, end) == 2 + 3 + 4
+	assert database.total_consumption(conn, start=start) == 45 - 1
+	assert database.total_consumption(conn, end=end) == 1 + 2 + 3 + 4
+
+
+def test_concurrent_reader(tmp_pathplus: PathPlus):
+	db_file = tmp_pathplus / "data.db"
+
+	with closing(database.connect(db_file)) as writer, closing(database.connect(db_file)) as reader:
+		database.insert_consumption(writer, consumption_data[:5])
+
+		with reader:
+			# A read transaction sees a consistent snapshot while the writer appends.
+			reader.execute("BEGIN")
+			assert database.total_consumption(reader) == 0 + 1 + 2 + 3 + 4
+			database.insert_consumption(writer, consumption_data[5:])
+			assert database.total_consumption(reader) == 0 + 1 + 2 + 3 + 4
+
+		assert database.total_consumption(reader) == 45
+
+
+@given(data=consumption_series())
+def test_migrate_json(data):
+	with TemporaryPathPlus() as tmpdir:
+		consumption.to_json(data, tmpdir / "data.json")
+		database.migrate_json(tmpdir / "data.json", tmpdir / "data.db")
+
+		with closing(database.connect(tmpdir / "data.db")) as conn:
+			assert database.load_consumption(conn) == data
+
+
+def test_migrate_json_cli(tmp_pathplus: PathPlus, monkeypatch):
+	consumption.to_json(consumption_data, tmp_pathplus / "data.json")
+	monkeypatch.chdir(tmp_pathplus)
+
+	main(["migrate", "data.json", "data.db"])
+
+	with closing(database.connect(tmp_pathplus / "data.db")) as conn:
+		assert database.load_consumption(conn) == consumption_data
+
+
+@pytest.mark.parametrize("filename", ["data.json", "data.db"])
+def test_load_consumption_data(tmp_pathplus: PathPlus, filename: str):
+	config = make_config(tmp_pathplus / filename)
+	assert load_consumption_data(config) == []
+
+	if database.is_database(config.datafile):
+		with closing(database.connect(config.datafile)) as conn:
+			database.insert_consumption(conn, consumption_data)
+	else:
+		consumption.to_json(consumption_data, config.datafile)
+
+	start = consumption_data[2]["start_time"]
+	end = consumption_data[5]["start_time"]
+
+	assert load_consumption_data(config) == consumption_data
+	assert load_consumption_data(config, start, end) == consumption_data[2:5]
+	assert load_consumption_data(config, start=start) == consumption_data[2:]
+	assert load_consumption_data(config, end=end) == consumption_data[:5]
+
+
+def test_to_json_cleans_up_on_failure(tmp_pathplus: PathPlus):
+	datafile = tmp_pathplus / "data.json"
+	consumption.to_json(consumption_data, datafile)
+
+	with pytest.raises(TypeError, match="not JSON serializable"):
+		consumption.to_json([{"value": object(), "start_time": start_time}], datafile)  # type: ignore[typeddict-item]
+
+	assert consumption.from_json(datafile) == consumption_data
+	assert [path.name for path in tmp_pathplus.iterdir()] == ["data.json"]
+
+
+def test_other_timezones(conn):
+	database.insert_consumption(conn, consumption_data)
+	bst = datetime.timezone(datetime.timedelta(hours=1))
+	start = consumption_data[2]["start_time"]
+	end = consumption_data[5]["start_time"]
+
+	assert database.total_consumption(conn, start.astimezone(bst), end.astimezone(bst)) == 2 + 3 + 4
+	assert database.load_consumption(conn, start.astimezone(bst), end.astimezone(bst)) == consumption_data[2:5]
+
+	# The same time in a different timezone is a duplicate.
+	database.insert_consumption(conn, [{"value": 100.0, "start_time": start.astimezone(bst)}])
+	assert database.load_consumption(conn) == consumption_data
+
+
+def test_naive_datetimes(conn):
+	naive = datetime.datetime(2023, 1, 10, 12, 0)
+
+	with pytest.raises(ValueError, match="must have a timezone"):
+		database.insert_consumption(conn, [{"value": 1.0, "start_time": naive}])
+	with pytest.raises(ValueError, match="must have a timezone"):
+		database.load_consumption(conn, start=naive)
+	with pytest.raises(ValueError, match="must have a timezone"):
+		database.total_consumption(conn, end=naive)
+
+	assert database.load_consumption(conn) == []
+
+
+def test_read_only(tmp_pathplus: PathPlus):
+	db_file = tmp_pathplus / "data.db"
+
+	with closing(database.connect(db_file)) as conn:
+		database.insert_consumption(conn, consumption_data)
+
+	with closing(database.connect(db_file, read_only=True)) as conn:
+		assert database.load_consumption(conn) == consumption_data
+
+		with pytest.raises(sqlite3.OperationalError, match="readonly"):
+			database.insert_consumption(conn, consumption_data)
+
+
+@pytest.mark.parametrize("filename", ["data.json", "data.db"])
+def test_load_consumption_data_naive(tmp_pathplus: PathPlus, filename: str):
+	config = make_config(tmp_pathplus / filename)
+	naive = datetime.datetime(2023, 1, 10, 12, 0)
+
+	with pytest.raises(ValueError, match="must have a timezone"):
+		load_consumption_data(config, start=naive)
+	with pytest.raises(ValueError, match="must have a timezone"):
+		load_consumption_data(config, end=naive)
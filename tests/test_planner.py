@@ -0,0 +1,307 @@
+# stdlib
+import datetime
+import math
+from typing import List, Tuple
+
+# 3rd party
+import pytest
+from hypothesis import given
+from domdf_python_tools.paths import PathPlus
+from hypothesis import strategies as st
+
+# this package
+from car_charging import consumption
+from car_charging.__main__ import main
+from car_charging.influxdb import tele_period
+from car_charging.planner import ChargingPlan, ChargingProfile, plan_charging, rate_timeline, slot_length
+from car_charging.tariff import Tariff
+from car_charging.utils import compensate_bst
+from tests import reference
+from tests.strategies import aware_datetimes, rates, tariff_lists
+
+utc = datetime.timezone.utc
+now = datetime.datetime(2024, 1, 10, 17, 0, tzinfo=utc)
+
+wrapping_tariff = Tariff(
+		datetime.time(23, 30),
+		datetime.time(5, 30),
+		day_rate=30.0,
+		night_rate=10.0,
+		start_date=datetime.datetime(2000, 1, 1, tzinfo=utc),
+		)
+
+
+def make_timeline(slot_rates: List[float]) -> List[Tuple[datetime.datetime, float]]:
+	return [(now + slot_length * idx, rate) for idx, rate in enumerate(slot_rates)]
+
+
+def brute_force(
+		energy: float,
+		charge_rate: float,
+		deadline: datetime.datetime,
+		timeline: List[Tuple[datetime.datetime, float]],
+		) -> float:
+	slot_energy = charge_rate * slot_length.total_seconds() / 3600
+	duration = datetime.timedelta(hours=energy / charge_rate)
+	best_cost = math.inf
+
+	for idx, (slot_start, rate) in enumerate(timeline):
+		if slot_start + duration > deadline:
+			continue
+
+		energy_left = energy
+		cost = 0.0
+		for slot_start, rate in timeline[idx:]:
+			if energy_left <= 1e-9:
+				break
+			used = min(slot_energy, energy_left)
+			cost += used * rate
+			energy_left -= used
+		else:
+			if energy_left > 1e-9:
+				continue
+
+		best_cost = min(best_cost, cost)
+
+	return best_cost
+
+
+@given(
+		slot_rates=st.lists(rates(), min_size=1, max_size=96),
+		energy=st.floats(min_value=0.1, max_value=80),
+		charge_rate=st.floats(min_value=1, max_value=22),
+		deadline_offset=st.integers(min_value=0, max_value=96 * 30),
+		)
+def test_matches_brute_force(slot_rates, energy, charge_rate, deadline_offset):
+	timeline = make_timeline(slot_rates)
+	deadline = now + datetime.timedelta(minutes=deadline_offset)
+	expected = brute_force(energy, charge_rate, deadline, timeline)
+
+	if math.isinf(expected):
+		with pytest.raises(ValueError, match="Not enough time"):
+			plan_charging(energy, charge_rate, deadline, timeline=timeline, now=now)
+	else:
+		plan = plan_charging(energy, charge_rate, deadline, timeline=timeline, now=now)
+		assert plan.cost == pytest.approx(expected, rel=1e-9, abs=1e-9)
+		assert plan.end <= deadline
+		assert plan.end - plan.start == datetime.timedelta(hours=energy / charge_rate)
+
+
+@given(tariffs=tariff_lists(), start=aware_datetimes())
+def test_rate_timeline(tariffs, start):
+	timeline = rate_timeline(tariffs, start, start + datetime.timedelta(days=1))
+	assert len(timeline) == 48
+
+	for slot_start, rate in timeline:
+		the_date = compensate_bst(slot_start)
+		assert rate == reference.get_rate(reference.find_tariff(tariffs, the_date), the_date.time())
+
+
+def test_night_window_wraps_midnight():
+	deadline = datetime.datetime(2024, 1, 11, 7, 0, tzinfo=utc)
+	plan = plan_charging(21, 7, deadline, tariffs=[wrapping_tariff], now=now)
+
+	assert plan == ChargingPlan(
+			start=datetime.datetime(2024, 1, 10, 23, 30, tzinfo=utc),
+			end=datetime.datetime(2024, 1, 11, 2, 30, tzinfo=utc),
+			cost=pytest.approx(210),
+			)
+
+
+def test_night_window_wraps_midnight_bst():
+	# 22:30 UTC is 23:30 BST
+	summer_now = now.replace(month=7)
+	deadline = datetime.datetime(2024, 7, 11, 7, 0, tzinfo=utc)
+	plan = plan_charging(21, 7, deadline, tariffs=[wrapping_tariff], now=summer_now)
+
+	assert plan.start == datetime.datetime(2024, 7, 10, 22, 30, tzinfo=utc)
+	assert plan.cost == pytest.approx(210)
+
+
+def test_longer_than_night_window():
+	deadline = datetime.datetime(2024, 1, 11, 7, 0, tzinfo=utc)
+	plan = plan_charging(56, 7, deadline, tariffs=[wrapping_tariff], now=now)
+
+	# 6 hours at the night rate, 2 hours at the day rate.
+	assert plan.cost == pytest.approx(42 * 10 + 14 * 30)
+	assert plan.end - plan.start == datetime.timedelta(hours=8)
+
+
+def test_deadline_not_on_slot_boundary():
+	# The night rate ends at 05:30, but charging must be finished by 01:10.
+	deadline = datetime.datetime(2024, 1, 11, 1, 10, tzinfo=utc)
+	plan = plan_charging(7, 7, deadline, tariffs=[wrapping_tariff], now=now)
+
+	assert plan.start == datetime.datetime(2024, 1, 10, 23, 30, tzinfo=utc)
+	assert plan.end <= deadline
+
+	# Only one start time (00:00) finishes in time for 70 minutes of charging.
+	plan = plan_charging(
+			7,
+			6,
+			datetime.datetime(2024, 1, 11, 1, 10, tzinfo=utc),
+			tariffs=[wrapping_tariff],
+			now=datetime.datetime(2024, 1, 10, 23, 45, tzinfo=utc),
+			)
+	assert plan.start == datetime.datetime(2024, 1, 11, 0, 0, tzinfo=utc)
+
+
+def test_now_not_on_slot_boundary():
+	plan = plan_charging(3.5, 7, now + datetime.timedelta(hours=1), tariffs=[wrapping_tariff], now=now.replace(minute=1))
+	assert plan.start == now + slot_length
+
+
+def test_exact_fit():
+	timeline = make_timeline([10.0] * 40)
+	plan = plan_charging(14.0, 0.7, deadline=now + datetime.timedelta(hours=20), timeline=timeline, now=now)
+
+	assert plan.start == now
+	assert plan.end == now + datetime.timedelta(hours=20)
+	assert plan.cost == pytest.approx(140)
+
+
+def test_not_enough_time():
+	with pytest.raises(ValueError, match="Not enough time to charge before the deadline."):
+		plan_charging(200, 7, now + datetime.timedelta(hours=12), tariffs=[wrapping_tariff], now=now)
+
+
+@pytest.mark.parametrize(
+		"energy, charge_rate, match",
+		[
+				(0, 7, "'energy' must be greater than zero."),
+				(-1, 7, "'energy' must be greater than zero."),
+				(10, 0, "'charge_rate' must be greater than zero."),
+				(10, -7, "'charge_rate' must be greater than zero."),
+				]
+		)
+def test_invalid_arguments(energy, charge_rate, match):
+	with pytest.raises(ValueError, match=match):
+		plan_charging(energy, charge_rate, now + datetime.timedelta(hours=12), tariffs=[wrapping_tariff], now=now)
+
+
+def test_no_tariffs_or_timeline():
+	with pytest.raises(TypeError, match="Either 'tariffs' or 'timeline' must be given."):
+		plan_charging(10, 7, now + datetime.timedelta(hours=12), now=now)
+
+
+def test_no_matching_tariff():
+	tariff = Tariff(datetime.time(23, 30), datetime.time(5, 30), 30.0, 10.0, start_date=now + datetime.timedelta(hours=2))
+
+	with pytest.raises(ValueError, match="No matching tariff for"):
+		plan_charging(10, 7, now + datetime.timedelta(hours=12), tariffs=[tariff], now=now)
+
+
+def test_charging_profile():
+	charging_periods = [
+			(20.0, now, now + datetime.timedelta(hours=3), 200.0),
+			(10.0, now, now + datetime.timedelta(hours=1, minutes=30), 100.0),
+			(7.0, now, now + datetime.timedelta(hours=1), 70.0),
+			(0.005, now, now + datetime.timedelta(seconds=20), 0.05),  # Ignored
+			]
+
+	profile = ChargingProfile.from_charging_periods(charging_periods)
+
+	assert profile.charge_rate == pytest.approx(20 / 3)
+	assert profile.typical_energy == 10.0
+
+
+def test_charging_profile_no_periods():
+	with pytest.raises(ValueError, match="No charging periods to learn from."):
+		ChargingProfile.from_charging_periods([])
+
+	with pytest.raises(ValueError, match="No charging periods to learn from."):
+		ChargingProfile.from_charging_periods([(0.005, now, now + datetime.timedelta(seconds=20), 0.05)])
+
+
+def test_timeline_not_contiguous():
+	timeline = make_timeline([10.0] * 10)
+	del timeline[4]
+
+	with pytest.raises(ValueError, match="'timeline' is not contiguous between"):
+		plan_charging(7, 7, now + datetime.timedelta(hours=12), timeline=timeline, now=now)
+
+	# Gaps outside of the window between now and the deadline don't matter.
+	plan = plan_charging(7, 7, now + datetime.timedelta(hours=12), timeline=timeline, now=timeline[4][0])
+	assert plan.start == timeline[4][0]
+
+
+def test_naive_datetimes():
+	naive = datetime.datetime(2024, 1, 11, 7, 0)
+
+	with pytest.raises(ValueError, match="'deadline' must have a timezone."):
+		plan_charging(7, 7, naive, tariffs=[wrapping_tariff])
+
+	with pytest.raises(ValueError, match="'now' must have a timezone."):
+		plan_charging(7, 7, naive.replace(tzinfo=utc), tariffs=[wrapping_tariff], now=naive.replace(hour=1))
+
+
+@pytest.fixture()
+def plan_config(tmp_path, monkeypatch) -> PathPlus:
+	monkeypatch.chdir(tmp_path)
+
+	config_file = PathPlus(tmp_path) / "config.toml"
+	config_file.write_lines([
+			'datafile = "car_charging.json"',
+			"[influxdb]",
+			'host = ""',
+			'token = ""',
+			'org = ""',
+			'topic = ""',
+			'field = ""',
+			'[tariffs."Overnight"]',
+			"night_start_time = 23:30:00",
+			"night_end_time = 05:30:00",
+			"night_rate = 10.0",
+			"day_rate = 30.0",
+			"start_date = 2000-01-01T00:00:00",
+			])
+
+	# A single 3 hour charging session at 7 kW
+	session_start = datetime.datetime(2024, 1, 5, 1, 0, tzinfo=utc)
+	consumption_data = [{
+			"value": 7000 * tele_period.total_seconds() / 3600,
+			"start_time": session_start + tele_period * idx,
+			} for idx in range(540)]
+	consumption.to_json(consumption_data, PathPlus(tmp_path) / "car_charging.json")
+
+	return config_file
+
+
+def test_plan_cli(plan_config: PathPlus, capsys):
+	deadline = datetime.datetime.now(tz=utc) + datetime.timedelta(days=2)
+	main(["plan", str(plan_config), "--deadline", deadline.isoformat()])
+
+	start = datetime.datetime.fromisoformat(capsys.readouterr().out.strip())
+	assert start.utcoffset() == datetime.timedelta(0)
+	assert start + datetime.timedelta(hours=3) <= deadline
+
+	# The typical session is 21 kWh, which fits in the night window.
+	for offset in range(6):
+		the_date = compensate_bst(start + slot_length * offset)
+		assert wrapping_tariff.get_rate(the_date.time()) == 10.0
+
+
+def test_plan_cli_energy(plan_config: PathPlus, capsys):
+	# Naive times are local time
+	deadline = (datetime.datetime.now() + datetime.timedelta(hours=2)).replace(microsecond=0)
+	main(["plan", str(plan_config), "--deadline", deadline.isoformat(), "--energy", "3.5"])
+
+	start = datetime.datetime.fromisoformat(capsys.readouterr().out.strip())
+	assert start + datetime.timedelta(minutes=30) <= deadline.astimezone()
+
+
+def test_plan_cli_errors(plan_config: PathPlus, capsys):
+	deadline = datetime.datetime.now(tz=utc) + datetime.timedelta(hours=2)
+
+	with pytest.raises(SystemExit, match='1'):
+		main(["plan", str(plan_config), "--deadline", deadline.isoformat(), "--energy", "100"])
+	assert capsys.readouterr().err == "Error: Not enough time to charge before the deadline.\n"
+
+	with pytest.raises(SystemExit, match='2'):
+		main(["plan", str(plan_config), "--deadline", "tomorrow"])
+	assert "invalid ISO 8601 date and time: 'tomorrow'" in capsys.readouterr().err
+
+	(plan_config.parent / "car_charging.json").unlink()
+	with pytest.raises(SystemExit, match='1'):
+		main(["plan", str(plan_config), "--deadline", deadline.isoformat()])
+	assert capsys.readouterr().err == "Error: No consumption data to learn the charging profile from.\n"
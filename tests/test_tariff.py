@@ -0,0 +1,73 @@
+# stdlib
+import datetime
+
+# 3rd party
+import pytest
+from hypothesis import given
+
+# this package
+from car_charging.tariff import Tariff
+from tests import reference
+from tests.strategies import aware_datetimes, tariff_lists, times
+
+utc = datetime.timezone.utc
+
+
+@given(tariffs=tariff_lists(), time=times())
+def test_get_rate_matches_reference(tariffs, time):
+	for tariff in tariffs:
+		assert tariff.get_rate(time) == reference.get_rate(tariff, time)
+
+
+@given(tariffs=tariff_lists(), date=aware_datetimes())
+def test_is_active_matches_reference(tariffs, date):
+	active = [tariff for tariff in tariffs if tariff.is_active(date)]
+	assert active == [reference.find_tariff(tariffs, date)]
+
+
+@pytest.mark.parametrize(
+		"time, rate",
+		[
+				(datetime.time(23, 29), 30.0),
+				(datetime.time(23, 30), 10.0),
+				(datetime.time(23, 59), 10.0),
+				(datetime.time(0, 0), 10.0),
+				(datetime.time(5, 29), 10.0),
+				(datetime.time(5, 30), 30.0),
+				(datetime.time(12, 0), 30.0),
+				]
+		)
+def test_get_rate_night_wraps_midnight(time, rate):
+	tariff = Tariff(datetime.time(23, 30), datetime.time(5, 30), day_rate=30.0, night_rate=10.0)
+	assert tariff.night_start_time > tariff.night_end_time
+	assert tariff.get_rate(time) == rate
+
+
+@pytest.mark.parametrize(
+		"time, rate",
+		[
+				(datetime.time(0, 29), 30.0),
+				(datetime.time(0, 30), 10.0),
+				(datetime.time(4, 29), 10.0),
+				(datetime.time(4, 30), 30.0),
+				]
+		)
+def test_get_rate(time, rate):
+	tariff = Tariff(datetime.time(0, 30), datetime.time(4, 30), day_rate=30.0, night_rate=10.0)
+	assert tariff.get_rate(time) == rate
+
+
+def test_is_active_at_switchover():
+	switchover = datetime.datetime(2023, 1, 15, 12, 0, tzinfo=utc)
+	old = Tariff(datetime.time(0, 30), datetime.time(4, 30), 30.0, 10.0, end_date=switchover)
+	new = Tariff(datetime.time(0, 30), datetime.time(4, 30), 35.0, 8.0, start_date=switchover)
+
+	assert old.is_active(switchover - datetime.timedelta(seconds=1))
+	assert not new.is_active(switchover - datetime.timedelta(seconds=1))
+	assert not old.is_active(switchover)
+	assert new.is_active(switchover)
+
+
+def test_is_active_no_dates():
+	tariff = Tariff(datetime.time(0, 30), datetime.time(4, 30), 30.0, 10.0)
+	assert not tariff.is_active(datetime.datetime(2023, 1, 15, tzinfo=utc))